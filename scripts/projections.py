@@ -13,12 +13,24 @@ v4.0 Changes:
 - Chip strategy works without DGW (fixture-based triggers)
 """
 
+import hashlib
+import heapq
+import os
+import re
+import threading
+import time
 import requests
-import json
-from datetime import datetime
+import orjson
+from bisect import bisect_left
+from datetime import date, datetime
 from pathlib import Path
 from difflib import SequenceMatcher
-from collections import defaultdict
+from functools import lru_cache
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from itertools import repeat
+from operator import attrgetter, itemgetter
 from understatapi import UnderstatClient
 
 # =============================================================================
@@ -41,6 +53,15 @@ OWNERSHIP_WEIGHT = 0.1        # Small penalty for template players (>30% owned)
 # Near-term fixtures matter more - decay weights for GW1-4
 FIXTURE_WEIGHTS = [1.0, 0.85, 0.65, 0.50]  # GW1 = full weight, GW4 = 50%
 
+# Concurrent element-summary requests when prefetching player histories
+HISTORY_FETCH_WORKERS = 8
+
+# On-disk API response cache so repeat runs skip the network
+FETCH_CACHE_DIR = Path.home() / '.fpl-brain-cache'
+FETCH_CACHE_TTL = 300             # bootstrap, fixtures, entry - 5 min
+PLAYER_HISTORY_CACHE_TTL = 86400  # element-summary history - 1 day
+UNDERSTAT_CACHE_TTL = 86400       # Understat league snapshot - 1 day
+
 BASE_URL = "https://fantasy.premierleague.com/api"
 BOOTSTRAP_URL = f"{BASE_URL}/bootstrap-static/"
 FIXTURES_URL = f"{BASE_URL}/fixtures/"
@@ -54,10 +75,19 @@ PTS_ASSIST = 3
 PTS_CLEAN_SHEET = {1: 4, 2: 4, 3: 1, 4: 0}
 PTS_APPEARANCE = 2
 
+# xMin availability by FPL status when chance_of_playing is missing
+# (a=available, d=doubtful; injured/suspended/unavailable -> 0)
+STATUS_AVAILABILITY = {'a': 1.0, 'd': 0.5}
+
+# Share of a player's owners expected to captain them, by ownership band:
+# <=15% -> 0.1, >15% -> 0.25, >30% -> 0.4, >50% -> 0.6 (~60% of owners captain)
+CAPTAIN_SHARE_BANDS = (15, 30, 50)
+CAPTAIN_SHARE_BY_BAND = (0.1, 0.25, 0.4, 0.6)
+
 # Known rotation risks - update as season progresses
 ROTATION_RISKS = {
-    'high': ['Foden', 'Stones', 'Gvardiol', 'Grealish', 'Doku', 'Nkunku', 'Sterling', 'Neto'],
-    'medium': ['Diaz', 'Gakpo', 'Jota', 'Rashford', 'Mount', 'Garnacho', 'Gordon', 'Barnes']
+    'high': frozenset(['Foden', 'Stones', 'Gvardiol', 'Grealish', 'Doku', 'Nkunku', 'Sterling', 'Neto']),
+    'medium': frozenset(['Diaz', 'Gakpo', 'Jota', 'Rashford', 'Mount', 'Garnacho', 'Gordon', 'Barnes'])
 }
 
 # Valid FPL formations: (DEF, MID, FWD) - GK is always 1
@@ -66,92 +96,189 @@ VALID_FORMATIONS = [
     (4, 5, 1), (5, 2, 3), (5, 3, 2), (5, 4, 1)
 ]
 
+# Shared read-only defaults for lookup misses (never mutate)
+_EMPTY_DICT = {}
+_EMPTY_SET = frozenset()
+
 # =============================================================================
 # DATA FETCHING
 # =============================================================================
 
-def fetch_json(url):
+# Shared session so repeated FPL API calls reuse the keep-alive connection
+SESSION = requests.Session()
+
+def _cache_path(key):
+    return FETCH_CACHE_DIR / hashlib.md5(key.encode()).hexdigest()
+
+
+def _read_cache(key, ttl):
+    """Cached JSON for key (a URL or snapshot name) if it is younger than ttl seconds, else None."""
+    path = _cache_path(key)
+    try:
+        if time.time() - path.stat().st_mtime < ttl:
+            return orjson.loads(path.read_bytes())
+    except (OSError, orjson.JSONDecodeError):
+        pass
+    return None
+
+
+def _write_cache(key, content):
+    """Best-effort atomic write - a cache failure never fails the run."""
+    path = _cache_path(key)
     try:
-        resp = requests.get(url, timeout=30)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(f'.{os.getpid()}.{threading.get_ident()}.tmp')
+        tmp.write_bytes(content)
+        tmp.replace(path)
+    except OSError:
+        pass
+
+
+def fetch_json(url, ttl=FETCH_CACHE_TTL, cache_key=None):
+    """GET url as JSON via the disk cache (keyed by cache_key, default the url)."""
+    cache_key = cache_key or url
+    cached = _read_cache(cache_key, ttl)
+    if cached is not None:
+        return cached
+    try:
+        resp = SESSION.get(url, timeout=30)
         resp.raise_for_status()
-        return resp.json()
+        data = resp.json()
     except Exception as e:
         print(f"Error fetching {url}: {e}")
         return None
+    if data is not None:
+        _write_cache(cache_key, orjson.dumps(data))
+    return data
 
 
 def get_understat_data():
     print("Fetching Understat xG data...")
+    # Season xG only moves once per matchday - reuse today's snapshot
+    cache_key = f"understat:EPL:2024:{date.today().isoformat()}"
+    cached = _read_cache(cache_key, UNDERSTAT_CACHE_TTL)
+    if cached is not None:
+        return cached['players'], cached['teams']
     try:
         understat = UnderstatClient()
         player_data = understat.league(league="EPL").get_player_data(season="2024")
         team_data = understat.league(league="EPL").get_team_data(season="2024")
-        return player_data, team_data
     except Exception as e:
         print(f"Error fetching Understat data: {e}")
         return None, None
+    if player_data and team_data:
+        _write_cache(cache_key, orjson.dumps({'players': player_data, 'teams': team_data}))
+    return player_data, team_data
+
+
+# Normalize team names (FPL -> Understat)
+TEAM_NORMALIZE = {
+    'man city': 'manchester city',
+    'man utd': 'manchester united',
+    'spurs': 'tottenham',
+    'newcastle': 'newcastle united',
+    "nott'm forest": 'nottingham forest',
+}
+
 
+def build_understat_team_index(understat_players, team_name_map):
+    """
+    Bucket Understat players by FPL team id so name matching only scans the
+    player's own team. Keeps the original substring team filter and order.
+    Each bucket is (entries, first position of each lowercase name), where
+    entries are (lowercase name, last name token, understat player).
+    """
+    entries = []
+    for us_player in understat_players:
+        us_name = us_player.get('player_name', '').lower()
+        us_name_parts = us_name.split()
+        entries.append((
+            us_player.get('team_title', '').lower(),  # Fix: was 'team_name'
+            us_name,
+            us_name_parts[-1] if us_name_parts else None,
+            us_player,
+        ))
+
+    index = {}
+    for team_id, team_name in team_name_map.items():
+        fpl_team = team_name.lower()
+        normalized_team = TEAM_NORMALIZE.get(fpl_team, fpl_team)
+        candidates = [
+            (us_name, us_last, us_player)
+            for us_team, us_name, us_last, us_player in entries
+            if not normalized_team or normalized_team in us_team
+        ]
+        first_pos = {}
+        for pos, (us_name, _, _) in enumerate(candidates):
+            first_pos.setdefault(us_name, pos)
+        index[team_id] = (candidates, first_pos)
+    return index
+
+
+def _ratio_if_relevant(matcher, floor):
+    """
+    matcher.ratio() if it could clear the 0.6 threshold and beat floor, else 0.
+    The cheap upper bounds rule most pairs out before the full ratio().
+    """
+    for bound in (matcher.real_quick_ratio, matcher.quick_ratio, matcher.ratio):
+        value = bound()
+        if value < 0.6 or value <= floor:
+            return 0
+    return value
 
-def match_player_names(fpl_player, understat_players, team_name_map):
+
+def match_player_names(fpl_player, understat_bucket):
     """
     Improved matching using multiple name fields and team normalization.
     Fixes: threshold >= 0.6, team_title key, multi-name matching.
+    understat_bucket: the player's team bucket from build_understat_team_index.
     """
     # Use all available name fields
     web_name = fpl_player.get('web_name', '').lower().strip()
     first_name = fpl_player.get('first_name', '').lower().strip()
     second_name = fpl_player.get('second_name', '').lower().strip()
     full_name = f"{first_name} {second_name}".strip()
-    fpl_team_id = fpl_player.get('team')
-
-    # Normalize team names (FPL -> Understat)
-    TEAM_NORMALIZE = {
-        'man city': 'manchester city',
-        'man utd': 'manchester united',
-        'spurs': 'tottenham',
-        'newcastle': 'newcastle united',
-        "nott'm forest": 'nottingham forest',
-    }
-    fpl_team = team_name_map.get(fpl_team_id, '').lower()
-    normalized_team = TEAM_NORMALIZE.get(fpl_team, fpl_team)
 
     best_match = None
     best_score = 0
 
-    for us_player in understat_players:
-        us_name = us_player.get('player_name', '').lower()
-        us_team = us_player.get('team_title', '').lower()  # Fix: was 'team_name'
+    # An identical name scores 1.0, which no later candidate can beat, so only
+    # the candidates before the first identical one need fuzzy scoring
+    candidates, first_pos = understat_bucket
+    exact_pos = min(first_pos.get(full_name, len(candidates)),
+                    first_pos.get(web_name, len(candidates)))
 
-        # Team filter with normalization
-        if normalized_team and normalized_team not in us_team:
-            continue
-
-        # Try multiple matching strategies
-        scores = [
-            SequenceMatcher(None, full_name, us_name).ratio(),      # Full name
-            SequenceMatcher(None, web_name, us_name).ratio(),       # Web name
-        ]
-
-        # Surname matching
-        if second_name:
-            us_name_parts = us_name.split()
-            if us_name_parts:
-                scores.append(SequenceMatcher(None, second_name, us_name_parts[-1]).ratio())
+    for us_name, us_last, us_player in candidates[:exact_pos]:
+        score = 0
 
         # Boost if surname matches exactly (handles "Salah" in "Mohamed Salah")
         if second_name and second_name in us_name:
-            scores.append(0.85)
+            score = 0.85
 
         # Boost for substring matches
-        if web_name in us_name or (us_name.split() and us_name.split()[-1] == web_name):
-            scores.append(0.85)
+        if web_name in us_name or us_last == web_name:
+            score = 0.85
 
-        score = max(scores)
+        # Try multiple matching strategies. A ratio only matters if it beats
+        # both the boosts above and the best match so far.
+        matcher = SequenceMatcher(None, full_name, us_name)                  # Full name
+        score = max(score, _ratio_if_relevant(matcher, max(score, best_score)))
+        matcher.set_seq1(web_name)                                           # Web name
+        score = max(score, _ratio_if_relevant(matcher, max(score, best_score)))
+
+        # Surname matching
+        if second_name and us_last is not None:
+            matcher = SequenceMatcher(None, second_name, us_last)
+            score = max(score, _ratio_if_relevant(matcher, max(score, best_score)))
 
         if score >= 0.6 and score > best_score:  # Fix: >= not >
             best_score = score
             best_match = us_player
+            if score >= 1.0:
+                return best_match
 
+    if exact_pos < len(candidates):
+        return candidates[exact_pos][2]
     return best_match
 
 
@@ -159,10 +286,32 @@ def match_player_names(fpl_player, understat_players, team_name_map):
 # ENHANCED DATA SOURCES (v4.0)
 # =============================================================================
 
-def get_player_history(player_id):
-    """Fetch detailed player history from FPL API."""
-    url = PLAYER_URL.format(player_id=player_id)
-    return fetch_json(url)
+_player_history_cache = {}
+
+
+def get_player_history(player_id, gw):
+    """
+    Fetch detailed player history from FPL API.
+    Cached in memory and on disk per (player, gw), so a deadline rollover never
+    serves the previous GW's history. gw is the GW being projected. Failed
+    fetches (None) are not cached, so the next caller retries them.
+    """
+    key = (player_id, gw)
+    data = _player_history_cache.get(key)
+    if data is None:
+        url = PLAYER_URL.format(player_id=player_id)
+        data = fetch_json(url, ttl=PLAYER_HISTORY_CACHE_TTL, cache_key=f"{url}?gw={gw}")
+        if data is not None:
+            _player_history_cache[key] = data
+    return data
+
+
+def prefetch_player_histories(player_ids, gw):
+    """Fetch any uncached player histories concurrently into the run cache."""
+    missing = {pid for pid in player_ids if (pid, gw) not in _player_history_cache}
+    if missing:
+        with ThreadPoolExecutor(max_workers=HISTORY_FETCH_WORKERS) as pool:
+            list(pool.map(get_player_history, missing, repeat(gw)))
 
 
 def calculate_rolling_form(history, matches=5):
@@ -212,10 +361,28 @@ def calculate_rolling_form(history, matches=5):
     }
 
 
+def _keyword_pattern(keywords):
+    """Compile keywords into one alternation matching any substring."""
+    return re.compile('|'.join(map(re.escape, keywords)))
+
+
+SEVERE_INJURY_RE = _keyword_pattern([
+    'surgery', 'acl', 'mcl', 'broken', 'fracture', 'season',
+    'months', 'long-term', 'ruled out'])
+MODERATE_INJURY_RE = _keyword_pattern([
+    'hamstring', 'groin', 'muscle', 'strain', 'weeks',
+    'scan', 'assessment', 'knock'])
+MINOR_INJURY_RE = _keyword_pattern([
+    'doubt', 'fitness', 'ill', 'sick', 'minor', 'dead leg',
+    'precaution', 'managed'])
+
+
+@lru_cache(maxsize=1024)
 def parse_injury_news(news):
     """
     Parse FPL news field to determine injury severity.
     Returns: severity score (0=healthy, 1=minor, 2=moderate, 3=severe)
+    Cached per news string - treat the returned dict as read-only.
     """
     if not news:
         return {'severity': 0, 'category': 'healthy', 'parsed': None}
@@ -223,25 +390,16 @@ def parse_injury_news(news):
     news_lower = news.lower()
 
     # Severe - likely out for extended period
-    severe_keywords = ['surgery', 'acl', 'mcl', 'broken', 'fracture', 'season',
-                       'months', 'long-term', 'ruled out']
-    for kw in severe_keywords:
-        if kw in news_lower:
-            return {'severity': 3, 'category': 'severe', 'parsed': news}
+    if SEVERE_INJURY_RE.search(news_lower):
+        return {'severity': 3, 'category': 'severe', 'parsed': news}
 
     # Moderate - likely out for a few weeks
-    moderate_keywords = ['hamstring', 'groin', 'muscle', 'strain', 'weeks',
-                         'scan', 'assessment', 'knock']
-    for kw in moderate_keywords:
-        if kw in news_lower:
-            return {'severity': 2, 'category': 'moderate', 'parsed': news}
+    if MODERATE_INJURY_RE.search(news_lower):
+        return {'severity': 2, 'category': 'moderate', 'parsed': news}
 
     # Minor - doubtful but might play
-    minor_keywords = ['doubt', 'fitness', 'ill', 'sick', 'minor', 'dead leg',
-                      'precaution', 'managed']
-    for kw in minor_keywords:
-        if kw in news_lower:
-            return {'severity': 1, 'category': 'minor', 'parsed': news}
+    if MINOR_INJURY_RE.search(news_lower):
+        return {'severity': 1, 'category': 'minor', 'parsed': news}
 
     # Unknown news - treat as minor concern
     return {'severity': 1, 'category': 'unknown', 'parsed': news}
@@ -277,9 +435,9 @@ def calculate_price_trend(history):
     return {'trend': trend, 'recent_change': price_change / 10}
 
 
-def get_enhanced_player_data(player_id, player):
+def get_enhanced_player_data(player_id, player, gw):
     """Fetch and calculate additional real-time data for a player."""
-    history_data = get_player_history(player_id)
+    history_data = get_player_history(player_id, gw)
 
     if not history_data:
         return {
@@ -305,7 +463,7 @@ def get_enhanced_player_data(player_id, player):
 # =============================================================================
 
 def analyze_fixtures(fixtures, teams, current_gw):
-    team_lookup = {t['id']: t for t in teams}
+    short_names = {t['id']: t.get('short_name', '?') for t in teams}
     
     gw_range = range(current_gw, current_gw + 10)
     team_fixtures = {t['id']: {gw: [] for gw in gw_range} for t in teams}
@@ -320,19 +478,20 @@ def analyze_fixtures(fixtures, teams, current_gw):
         
         home_id = f['team_h']
         away_id = f['team_a']
+        finished = f.get('finished', False)
         
         team_fixtures[home_id][gw].append({
             'opponent_id': away_id,
-            'opponent': team_lookup.get(away_id, {}).get('short_name', '?'),
+            'opponent': short_names.get(away_id, '?'),
             'is_home': True,
-            'finished': f.get('finished', False),
+            'finished': finished,
         })
         
         team_fixtures[away_id][gw].append({
             'opponent_id': home_id,
-            'opponent': team_lookup.get(home_id, {}).get('short_name', '?'),
+            'opponent': short_names.get(home_id, '?'),
             'is_home': False,
-            'finished': f.get('finished', False),
+            'finished': finished,
         })
     
     dgw_gws = [gw for gw, count in gw_fixture_counts.items() if count > 10]
@@ -376,17 +535,17 @@ def calculate_team_strengths(understat_teams, fpl_teams):
         'Wolves': 'Wolverhampton Wanderers'
     }
     
+    # Understat teams by lowercase title (first wins, as the old scan did)
+    us_by_title = {}
+    for t_data in (understat_teams or {}).values():
+        us_by_title.setdefault(t_data.get('title', '').lower(), t_data)
+    
     for fpl_team in fpl_teams:
         team_id = fpl_team['id']
         fpl_name = fpl_team['name']
         us_name = name_map.get(fpl_name, fpl_name)
         
-        us_team = None
-        if understat_teams:
-            for t_id, t_data in understat_teams.items():
-                if t_data.get('title', '').lower() == us_name.lower():
-                    us_team = t_data
-                    break
+        us_team = us_by_title.get(us_name.lower())
         
         if us_team and 'history' in us_team:
             history = us_team['history']
@@ -431,13 +590,61 @@ def get_fixture_difficulty(team_strengths, opponent_id, is_home):
     return max(0.6, min(1.5, difficulty))
 
 
+def format_fixture_labels(fixtures):
+    """Display labels like 'ARS (H)' for a list of team fixture dicts."""
+    return [f"{f['opponent']} {'(H)' if f['is_home'] else '(A)'}" for f in fixtures]
+
+
+def precompute_team_gw_fixtures(fixture_data, team_strengths, start_gw, n_gws=6):
+    """
+    Per-team fixture summary for each GW of the projection window.
+    Fixture difficulties and labels depend only on the team, so they
+    are built once per team instead of once per player.
+    """
+    team_gws = {}
+    for team_id, gw_data in fixture_data['team_fixtures'].items():
+        entries = []
+        for gw in range(start_gw, start_gw + n_gws):
+            gw_fixtures = gw_data.get(gw, [])
+            if not gw_fixtures:
+                entries.append({'gw': gw, 'is_bgw': True})
+                continue
+
+            difficulties = []
+            total_diff = 0
+            for fix in gw_fixtures:
+                diff = get_fixture_difficulty(team_strengths, fix['opponent_id'], fix['is_home'])
+                difficulties.append(diff)
+                total_diff += diff
+
+            avg_difficulty = total_diff / len(gw_fixtures)
+            entries.append({
+                'gw': gw,
+                'difficulties': difficulties,
+                'opponent': ', '.join(format_fixture_labels(gw_fixtures)),
+                'is_home': gw_fixtures[0]['is_home'],
+                'avg_difficulty': avg_difficulty,
+                'difficulty': round(avg_difficulty, 2),  # display value
+                'is_dgw': len(gw_fixtures) >= 2,
+                'is_bgw': False,
+            })
+        team_gws[team_id] = entries
+    return team_gws
+
+
 # =============================================================================
 # FORM ANALYSIS
 # =============================================================================
 
 def calculate_form_score(player):
-    form = float(player.get('form', 0) or 0)
-    points_per_game = float(player.get('points_per_game', 0) or 0)
+    return _form_score(player.get('form', 0), player.get('points_per_game', 0))
+
+
+@lru_cache(maxsize=1024)
+def _form_score(raw_form, raw_ppg):
+    """Cached on the raw API strings - treat the returned dict as read-only."""
+    form = float(raw_form or 0)
+    points_per_game = float(raw_ppg or 0)
     
     if points_per_game > 0:
         form_ratio = form / points_per_game
@@ -464,13 +671,9 @@ def calculate_player_xgi(fpl_player, understat_match, team_strengths):
             return None
         goals = int(fpl_player.get('goals_scored', 0) or 0)
         assists = int(fpl_player.get('assists', 0) or 0)
-        creativity = float(fpl_player.get('creativity', 0) or 0)
         return {
             'xg_p90': (goals / mins) * 90,
             'xa_p90': (assists / mins) * 90,
-            'npxg_p90': (goals / mins) * 90,
-            'shots_p90': (goals * 3 / mins) * 90,
-            'key_passes_p90': (creativity / 100 / mins) * 90,
             'minutes': mins,
             'games': int(fpl_player.get('starts', 1) or 1),
             'data_quality': 'approximated'
@@ -484,55 +687,92 @@ def calculate_player_xgi(fpl_player, understat_match, team_strengths):
     
     xg = float(understat_match.get('xG', 0))
     xa = float(understat_match.get('xA', 0))
-    npxg = float(understat_match.get('npxG', 0))
-    shots = int(understat_match.get('shots', 0))
-    key_passes = int(understat_match.get('key_passes', 0))
     
     return {
         'xg_p90': (xg / mins) * 90,
         'xa_p90': (xa / mins) * 90,
-        'npxg_p90': (npxg / mins) * 90,
-        'shots_p90': (shots / mins) * 90,
-        'key_passes_p90': (key_passes / mins) * 90,
         'minutes': mins,
         'games': games,
-        'total_xgi': xg + xa,
         'data_quality': 'understat'
     }
 
 
-def project_gameweek_points(player, xgi_stats, fixture_difficulty, 
-                            opponent_cs_prob, element_type, team_cs_prob,
-                            is_dgw=False):
+@dataclass(slots=True)
+class PointFactors:
+    """Fixture-independent inputs to a player's per-fixture points projection."""
+    xg_p90: float
+    xa_p90: float
+    goal_pts: int
+    cs_pts: float
+    appearance_pts: int
+    is_defensive: bool
+    team_cs_bonus: float
+    availability: float
+    mins_prob: float
+
+
+@dataclass(slots=True)
+class GwProjection:
+    """One GW of a player's projection; serialized as-is in 'fixtures'."""
+    gw: int
+    projected_pts: float
+    opponent: str
+    is_home: bool
+    difficulty: float
+    is_dgw: bool
+    is_bgw: bool
+
+
+def gameweek_point_factors(player, xgi_stats, element_type, team_cs_prob):
+    """
+    Everything in the points projection that does not depend on the fixture,
+    computed once per player. Returns None when the player projects to 0.
+    """
     if xgi_stats is None:
-        return 0
+        return None
     
     chance = player.get('chance_of_playing_next_round')
     if chance is not None and chance < 50:
-        return 0
+        return None
     availability = (chance / 100) if chance is not None else 0.95
     
     avg_mins = xgi_stats.get('minutes', 0) / max(1, xgi_stats.get('games', 1))
     mins_prob = min(1.0, avg_mins / 70)
     
-    xg_adj = xgi_stats['xg_p90'] / fixture_difficulty
-    xa_adj = xgi_stats['xa_p90'] / fixture_difficulty
+    return PointFactors(
+        xg_p90=xgi_stats['xg_p90'],
+        xa_p90=xgi_stats['xa_p90'],
+        goal_pts=PTS_GOAL.get(element_type, 4),
+        cs_pts=team_cs_prob * PTS_CLEAN_SHEET.get(element_type, 0),
+        appearance_pts=PTS_APPEARANCE if mins_prob > 0.6 else 1,
+        is_defensive=element_type in [1, 2],
+        team_cs_bonus=team_cs_prob * 1.5,
+        availability=availability,
+        mins_prob=mins_prob,
+    )
+
+
+def project_fixture_points(factors, fixture_difficulty, is_dgw=False):
+    """Projected points for one fixture from precomputed PointFactors."""
+    if factors is None:
+        return 0
     
-    goal_pts = xg_adj * PTS_GOAL.get(element_type, 4)
+    xg_adj = factors.xg_p90 / fixture_difficulty
+    xa_adj = factors.xa_p90 / fixture_difficulty
+    
+    goal_pts = xg_adj * factors.goal_pts
     assist_pts = xa_adj * PTS_ASSIST
-    cs_pts = team_cs_prob * PTS_CLEAN_SHEET.get(element_type, 0)
-    appearance_pts = PTS_APPEARANCE if mins_prob > 0.6 else 1
     
     xgi = xg_adj + xa_adj
-    if element_type in [1, 2]:
-        bonus_pts = min(3, xgi * 1.5 + (team_cs_prob * 1.5))
+    if factors.is_defensive:
+        bonus_pts = min(3, xgi * 1.5 + factors.team_cs_bonus)
     else:
         bonus_pts = min(3, xgi * 2.5) if xgi > 0.25 else 0
     
-    total = goal_pts + assist_pts + cs_pts + appearance_pts + bonus_pts
+    total = goal_pts + assist_pts + factors.cs_pts + factors.appearance_pts + bonus_pts
     multiplier = 2 if is_dgw else 1
     
-    return round(total * availability * mins_prob * multiplier, 2)
+    return round(total * factors.availability * factors.mins_prob * multiplier, 2)
 
 
 # =============================================================================
@@ -614,8 +854,7 @@ def calculate_xmin(player, player_proj, player_history=None):
     if chance is not None:
         availability = float(chance) / 100
     else:
-        status = player.get('status', 'a')
-        availability = 1.0 if status == 'a' else 0.5 if status == 'd' else 0.0
+        availability = STATUS_AVAILABILITY.get(player.get('status', 'a'), 0.0)
 
     # Rotation risk factor (known rotation-prone players)
     name = player.get('web_name', '')
@@ -645,11 +884,23 @@ def calculate_xmin(player, player_proj, player_history=None):
     return round(min(90, max(0, xmin)), 1)
 
 
-def calculate_effective_pts(projected_pts, xmin):
-    """Effective projection = projected_pts × (xMin / 90)"""
-    if xmin <= 0:
-        return 0
-    return round(projected_pts * (xmin / 90), 2)
+@dataclass(slots=True)
+class SquadRec:
+    """One squad player's projection for a single GW (Starting XI optimizer)."""
+    player_id: int
+    name: str
+    position: int
+    team_id: int
+    team: str
+    xmin: float
+    projected_pts: float
+    effective_pts: float
+    fixture: str
+    difficulty: float
+    is_dgw: bool
+    is_bgw: bool
+    selling_price: float
+    gw_status: str = 'available'
 
 
 def select_optimal_xi(squad_with_projections, gw, fixture_data):
@@ -659,66 +910,64 @@ def select_optimal_xi(squad_with_projections, gw, fixture_data):
     """
     available = []
     unavailable = []
+    team_fixtures = fixture_data['team_fixtures']
     
     for p in squad_with_projections:
-        team_id = p['team_id']
-        gw_fixtures = fixture_data['team_fixtures'].get(team_id, {}).get(gw, [])
+        gw_fixtures = team_fixtures.get(p.team_id, {}).get(gw, [])
         
         if not gw_fixtures:
-            p['gw_status'] = 'blank'
+            p.gw_status = 'blank'
             unavailable.append(p)
             continue
         
-        if p.get('xmin', 0) < 10:
-            p['gw_status'] = 'unlikely'
+        if p.xmin < 10:
+            p.gw_status = 'unlikely'
             unavailable.append(p)
             continue
         
-        p['gw_status'] = 'available'
+        p.gw_status = 'available'
         available.append(p)
     
     # Group by position
     by_pos = {1: [], 2: [], 3: [], 4: []}
     for p in available:
-        by_pos[p['position']].append(p)
+        by_pos[p.position].append(p)
     
+    by_eff = attrgetter('effective_pts')
     for pos in by_pos:
-        by_pos[pos].sort(key=lambda x: x.get('effective_pts', 0), reverse=True)
+        by_pos[pos].sort(key=by_eff, reverse=True)
     
-    # Find best valid formation
+    # Find best valid formation. Scores are summed GK->DEF->MID->FWD, left to
+    # right, so totals and near-tie formation choices match the plain XI sum.
+    n_def, n_mid, n_fwd = len(by_pos[2]), len(by_pos[3]), len(by_pos[4])
+    feasible = [
+        (def_c, mid_c, fwd_c) for def_c, mid_c, fwd_c in VALID_FORMATIONS
+        if def_c <= n_def and mid_c <= n_mid and fwd_c <= n_fwd
+    ] if by_pos[1] else []
+
     best_xi = None
     best_score = -1
     best_formation = None
-    
-    for def_c, mid_c, fwd_c in VALID_FORMATIONS:
-        if len(by_pos[1]) < 1: continue
-        if len(by_pos[2]) < def_c: continue
-        if len(by_pos[3]) < mid_c: continue
-        if len(by_pos[4]) < fwd_c: continue
-        
-        xi = [by_pos[1][0]]
-        xi.extend(by_pos[2][:def_c])
-        xi.extend(by_pos[3][:mid_c])
-        xi.extend(by_pos[4][:fwd_c])
-        
-        score = sum(p.get('effective_pts', 0) for p in xi)
-        
+
+    for def_c, mid_c, fwd_c in feasible:
+        xi = [by_pos[1][0], *by_pos[2][:def_c], *by_pos[3][:mid_c], *by_pos[4][:fwd_c]]
+        score = sum(map(by_eff, xi))
+        # Strict > keeps the first formation in VALID_FORMATIONS on a tie
         if score > best_score:
             best_score = score
             best_xi = xi
             best_formation = f"{def_c}-{mid_c}-{fwd_c}"
     
     if not best_xi:
-        all_sorted = sorted(available, key=lambda x: x.get('effective_pts', 0), reverse=True)
+        all_sorted = sorted(available, key=by_eff, reverse=True)
         best_xi = all_sorted[:11]
         best_formation = "?"
     
-    xi_ids = {p['player_id'] for p in best_xi}
-    bench = [p for p in available if p['player_id'] not in xi_ids]
+    xi_ids = {p.player_id for p in best_xi}
+    bench = [p for p in available if p.player_id not in xi_ids]
     bench.extend(unavailable)
-    bench.sort(key=lambda x: x.get('effective_pts', 0), reverse=True)
     
-    return best_xi, bench[:4], best_formation, best_score
+    return best_xi, heapq.nlargest(4, bench, key=by_eff), best_formation, best_score
 
 
 def generate_starting_xi_recommendations(my_picks, players, projections, 
@@ -727,81 +976,111 @@ def generate_starting_xi_recommendations(my_picks, players, projections,
     player_lookup = {p['id']: p for p in players}
     recommendations = []
     
+    # xMin depends only on the player, not the GW - compute once per pick
+    xmin_by_pid = {
+        pick['element']: calculate_xmin(player_lookup.get(pick['element'], {}),
+                                        projections.get(pick['element'], {}))
+        for pick in my_picks
+    }
+    # Player/team fields don't change across GWs: (name, position, team_id, team, price)
+    pick_info = {}
+    for pick in my_picks:
+        player = player_lookup.get(pick['element'], {})
+        pick_info[pick['element']] = (
+            player.get('web_name', pick.get('web_name', 'Unknown')),
+            player.get('element_type', pick.get('element_type', 0)),
+            player.get('team', pick.get('team_id', 0)),
+            team_strengths.get(player.get('team', 0), {}).get('short_name', '?'),
+            pick.get('selling_price', 0) / 10,
+        )
+    # Each projection has one fixtures entry per GW; index them by GW
+    fixtures_by_pid = {
+        pick['element']: {f.gw: f for f in projections.get(pick['element'], {}).get('fixtures', [])}
+        for pick in my_picks
+    }
+    # Stand-in for picks without a projection
+    no_projection = GwProjection(gw=0, projected_pts=0, opponent='?', is_home=False,
+                                 difficulty=1.0, is_dgw=False, is_bgw=False)
+    
     for gw in range(next_gw, next_gw + 6):
         squad = []
+        blank_count = low_xmin_count = 0
         for pick in my_picks:
             pid = pick['element']
-            player = player_lookup.get(pid, {})
-            proj = projections.get(pid, {})
+            name, position, team_id, team, selling_price = pick_info[pid]
+            gw_proj = fixtures_by_pid[pid].get(gw, no_projection)
+            gw_pts = gw_proj.projected_pts
             
-            gw_fixtures = proj.get('fixtures', [])
-            gw_proj = next((f for f in gw_fixtures if f.get('gw') == gw), {})
-            gw_pts = gw_proj.get('projected_pts', 0)
+            xmin = xmin_by_pid[pid]
+            # Effective projection = projected_pts × (xMin / 90)
+            eff_pts = round(gw_pts * (xmin / 90), 2) if xmin > 0 else 0
+            is_bgw = gw_proj.is_bgw
+            blank_count += is_bgw
+            low_xmin_count += xmin < 60
             
-            xmin = calculate_xmin(player, proj)
-            eff_pts = calculate_effective_pts(gw_pts, xmin)
-            
-            squad.append({
-                'player_id': pid,
-                'name': player.get('web_name', pick.get('web_name', 'Unknown')),
-                'position': player.get('element_type', pick.get('element_type', 0)),
-                'team_id': player.get('team', pick.get('team_id', 0)),
-                'team': team_strengths.get(player.get('team', 0), {}).get('short_name', '?'),
-                'xmin': xmin,
-                'projected_pts': round(gw_pts, 2),
-                'effective_pts': eff_pts,
-                'fixture': gw_proj.get('opponent', '?'),
-                'difficulty': gw_proj.get('difficulty', 1.0),
-                'is_dgw': gw_proj.get('is_dgw', False),
-                'is_bgw': gw_proj.get('is_bgw', False),
-                'selling_price': pick.get('selling_price', 0) / 10,
-            })
+            squad.append(SquadRec(
+                player_id=pid,
+                name=name,
+                position=position,
+                team_id=team_id,
+                team=team,
+                xmin=xmin,
+                projected_pts=round(gw_pts, 2),
+                effective_pts=eff_pts,
+                fixture=gw_proj.opponent,
+                difficulty=gw_proj.difficulty,
+                is_dgw=gw_proj.is_dgw,
+                is_bgw=is_bgw,
+                selling_price=selling_price,
+            ))
         
         xi, bench, formation, total_eff = select_optimal_xi(squad, gw, fixture_data)
         
-        xi_sorted = sorted(xi, key=lambda x: x['effective_pts'], reverse=True)
-        captain = xi_sorted[0] if xi_sorted else None
-        vice = xi_sorted[1] if len(xi_sorted) > 1 else None
+        top2 = heapq.nlargest(2, xi, key=attrgetter('effective_pts'))
+        captain = top2[0] if top2 else None
+        vice = top2[1] if len(top2) > 1 else None
         
-        blank_count = sum(1 for p in squad if p.get('is_bgw'))
-        low_xmin_count = sum(1 for p in squad if p.get('xmin', 0) < 60)
+        # A formation XI already comes out GK, DEF, MID, FWD with each line in
+        # effective_pts order; only the no-formation fallback needs sorting
+        if formation == "?":
+            xi = sorted(xi, key=lambda x: (x.position, -x.effective_pts))
         
         recommendations.append({
             'gameweek': gw,
             'formation': formation,
             'total_effective_pts': round(total_eff, 1),
             'captain': {
-                'name': captain['name'],
-                'team': captain['team'],
-                'effective_pts': captain['effective_pts'],
-                'xmin': captain['xmin'],
-                'fixture': captain['fixture'],
+                'name': captain.name,
+                'team': captain.team,
+                'effective_pts': captain.effective_pts,
+                'xmin': captain.xmin,
+                'fixture': captain.fixture,
             } if captain else None,
             'vice_captain': {
-                'name': vice['name'],
-                'effective_pts': vice['effective_pts'],
+                'name': vice.name,
+                'effective_pts': vice.effective_pts,
             } if vice else None,
             'starting_xi': [
                 {
-                    'name': p['name'],
-                    'position': ['GK', 'DEF', 'MID', 'FWD'][p['position'] - 1],
-                    'team': p['team'],
-                    'effective_pts': p['effective_pts'],
-                    'projected_pts': p['projected_pts'],
-                    'xmin': p['xmin'],
-                    'fixture': p['fixture'],
-                    'difficulty': p['difficulty'],
-                    'is_dgw': p['is_dgw'],
+                    'name': p.name,
+                    'position': ['GK', 'DEF', 'MID', 'FWD'][p.position - 1],
+                    'team': p.team,
+                    'effective_pts': p.effective_pts,
+                    'projected_pts': p.projected_pts,
+                    'xmin': p.xmin,
+                    'fixture': p.fixture,
+                    'difficulty': p.difficulty,
+                    'is_dgw': p.is_dgw,
                 }
-                for p in sorted(xi, key=lambda x: (x['position'], -x['effective_pts']))
+                for p in xi
             ],
             'bench': [
                 {
-                    'name': p['name'],
-                    'position': ['GK', 'DEF', 'MID', 'FWD'][p['position'] - 1],
-                    'effective_pts': p['effective_pts'],
-                    'xmin': p['xmin'],
-                    'status': p.get('gw_status', 'available'),
+                    'name': p.name,
+                    'position': ['GK', 'DEF', 'MID', 'FWD'][p.position - 1],
+                    'effective_pts': p.effective_pts,
+                    'xmin': p.xmin,
+                    'status': p.gw_status,
                     'bench_order': i + 1,
                 }
                 for i, p in enumerate(bench[:4])
@@ -833,10 +1112,10 @@ def calculate_weighted_projection(proj, weights=FIXTURE_WEIGHTS):
     weight_sum = 0
 
     for i, fix in enumerate(fixtures):
-        if fix.get('is_bgw'):
+        if fix.is_bgw:
             continue  # Skip blank GWs
         weight = weights[i] if i < len(weights) else 0.5
-        pts = fix.get('projected_pts', 0)
+        pts = fix.projected_pts
         weighted_total += pts * weight
         weight_sum += weight
 
@@ -854,39 +1133,40 @@ def get_transfer_recommendations(my_squad, all_players, projections, bank,
     recommendations = []
 
     squad_ids = {p['element'] for p in my_squad}
-    squad_team_counts = defaultdict(int)
-    for p in my_squad:
-        squad_team_counts[p.get('team_id', 0)] += 1
+    squad_team_counts = Counter(p.get('team_id', 0) for p in my_squad)
 
     starters = [p for p in my_squad if p.get('multiplier', 0) > 0]
 
+    prefetch_player_histories((pick['element'] for pick in starters), current_gw)
+
     starter_scores = []
     for pick in starters:
         player_id = pick['element']
         proj = projections.get(player_id, {})
+        form_trend = proj.get('form_trend')
+        chance = proj.get('chance_of_playing')
+        avg_difficulty = proj.get('avg_difficulty_4gw', 1.0)
 
         sell_score = 0
         reasons = []
 
         # Use weighted projection for sell decisions (v4.1)
         proj_4gw = calculate_weighted_projection(proj)
-        proj_4gw_raw = proj.get('next_4gw_pts', 0)
 
         if proj_4gw < SELL_THRESHOLD_4GW:
             sell_score += 3
             reasons.append('low_projection')
 
-        if proj.get('form_trend') == 'cold':
+        if form_trend == 'cold':
             sell_score += 2
             reasons.append('cold_form')
 
-        chance = proj.get('chance_of_playing')
         if chance is not None and chance < 75:
             sell_score += 3
             reasons.append('injury_doubt')
 
         # v4.3: Fetch player history and calculate rolling xMin
-        player_history = get_player_history(player_id)
+        player_history = get_player_history(player_id, current_gw)
         xmin = calculate_xmin(pick, proj, player_history)
 
         if xmin < 50:
@@ -920,7 +1200,6 @@ def get_transfer_recommendations(my_squad, all_players, projections, bank,
                 sell_score += 2
                 reasons.append(f'blank_gw{upcoming_blanks[0]}')
 
-        avg_difficulty = proj.get('avg_difficulty_4gw', 1.0)
         if avg_difficulty > 1.15:
             sell_score += 1
             reasons.append('hard_fixtures')
@@ -942,82 +1221,118 @@ def get_transfer_recommendations(my_squad, all_players, projections, bank,
             'sell_reasons': reasons,
         })
     
-    starter_scores.sort(key=lambda x: (-x['sell_score'], x['proj_4gw']))
+    # Only the three weakest starters are considered for a sale
+    weakest = heapq.nsmallest(3, starter_scores, key=lambda x: (-x['sell_score'], x['proj_4gw']))
     
-    for weak in starter_scores[:3]:
-        if weak['sell_score'] < 2:
+    # First DGW within 6 GWs per team (None if none), shared by all candidates
+    team_next_dgw = {
+        team: next((gw for gw in dgws if gw <= current_gw + 6), None)
+        for team, dgws in fixture_data['team_dgws'].items()
+    }
+    
+    # Candidate filters that don't depend on the outgoing player, applied
+    # once per needed position: (player, proj, cost, form_trend, avg_diff)
+    sell_positions = {w['position'] for w in weakest if w['sell_score'] >= 2}
+    eligible_by_pos = {pos: [] for pos in sell_positions}
+    for p in all_players:
+        if p['id'] in squad_ids:
+            continue
+        if p['element_type'] not in eligible_by_pos:
             continue
         
-        pos = weak['position']
-        budget = bank + weak['selling_price']
-        
-        candidates = []
-        for p in all_players:
-            if p['id'] in squad_ids:
-                continue
-            if p['element_type'] != pos:
-                continue
-            
-            cost = p['now_cost'] / 10
-            if cost > budget:
-                continue
-            
-            p_team = p['team']
-            current_count = squad_team_counts.get(p_team, 0)
-            if weak['team_id'] == p_team:
-                current_count -= 1
-            if current_count >= 3:
-                continue
-            
-            proj = projections.get(p['id'], {})
-            if not proj:
-                continue
+        proj = projections.get(p['id'], {})
+        if not proj:
+            continue
+        form_trend = proj.get('form_trend')
 
-            # Skip players not getting minutes (v4.0 fix)
-            recent_mins = int(p.get('minutes', 0) or 0)
-            starts = int(p.get('starts', 0) or 0)
-            if starts < 3 or recent_mins < 200:
-                continue  # Not a regular starter
+        # Skip players not getting minutes (v4.0 fix)
+        recent_mins = int(p.get('minutes', 0) or 0)
+        starts = int(p.get('starts', 0) or 0)
+        if starts < 3 or recent_mins < 200:
+            continue  # Not a regular starter
 
-            # Skip cold form players - they're out of favor (v4.0 fix)
-            if proj.get('form_trend') == 'cold':
-                continue
+        # Skip cold form players - they're out of favor (v4.0 fix)
+        if form_trend == 'cold':
+            continue
 
-            # Skip approximated data for transfers - unreliable (v4.0 fix)
-            if proj.get('data_quality') == 'approximated':
-                continue
+        # Skip approximated data for transfers - unreliable (v4.0 fix)
+        if proj.get('data_quality') == 'approximated':
+            continue
+
+        eligible_by_pos[p['element_type']].append((
+            p, proj, p['now_cost'] / 10, form_trend,
+            proj.get('avg_difficulty_4gw', 1.0),
+        ))
+    
+    def _candidate_stats(p, proj):
+        """
+        (xmin, weighted 4GW, effective 4GW) for a candidate, or None if it
+        fails the minutes/quality gates. Independent of the outgoing player.
+        """
+        # v4.3: Fetch player history and calculate xMin with rolling minutes
+        player_history = get_player_history(p['id'], current_gw)
+        candidate_xmin = calculate_xmin(p, proj, player_history)
+
+        # v4.3: Also get games missed info for filtering
+        # v4.4: Now returns 4-tuple with recent_misses
+        _, games_played, games_missed, recent_misses = calculate_rolling_minutes(player_history, last_n=5)
+
+        # v4.4: Filter by recent misses (last 2 GWs) not total misses
+        # This allows Bruno (missed GW20 but played 90 in last 3) to pass
+        if recent_misses >= 2:
+            return None  # Missed both recent games - unreliable
 
-            # v4.3: Fetch player history and calculate xMin with rolling minutes
-            player_history = get_player_history(p['id'])
-            candidate_xmin = calculate_xmin(p, proj, player_history)
+        # Skip players with very low xMin - rotation risk (v4.2)
+        if candidate_xmin < 50:
+            return None
 
-            # v4.3: Also get games missed info for filtering
-            # v4.4: Now returns 4-tuple with recent_misses
-            _, games_played, games_missed, recent_misses = calculate_rolling_minutes(player_history, last_n=5)
+        # Use weighted projection (v4.1) - near-term fixtures matter more
+        proj_4gw_weighted = calculate_weighted_projection(proj)
 
-            # v4.4: Filter by recent misses (last 2 GWs) not total misses
-            # This allows Bruno (missed GW20 but played 90 in last 3) to pass
-            if recent_misses >= 2:
-                continue  # Missed both recent games - unreliable
+        # v4.2: Calculate effective 4GW points (projection × xMin/90)
+        # This accounts for rotation risk in the gain calculation
+        xmin_factor = candidate_xmin / 90
+        effective_4gw = proj_4gw_weighted * xmin_factor
 
-            # Skip players with very low xMin - rotation risk (v4.2)
-            if candidate_xmin < 50:
-                continue
+        # Skip low quality players (v4.0) - use effective pts
+        # v4.4: Lower threshold to 0.80 to catch good players with moderate xMin (e.g., Bruno at 12.6)
+        if effective_4gw < MIN_BUY_PROJECTION * 0.80:  # 15 * 0.80 = 12.0 pts minimum
+            return None
 
-            # Use weighted projection (v4.1) - near-term fixtures matter more
-            proj_4gw_weighted = calculate_weighted_projection(proj)
+        return candidate_xmin, proj_4gw_weighted, effective_4gw
 
-            proj_4gw_raw = proj.get('next_4gw_pts', 0)
+    # Shared across weak picks in the same position
+    candidate_stats = {}
+
+    for weak in weakest:
+        if weak['sell_score'] < 2:
+            continue
+        
+        pos = weak['position']
+        budget = bank + weak['selling_price']
 
-            # v4.2: Calculate effective 4GW points (projection × xMin/90)
-            # This accounts for rotation risk in the gain calculation
-            xmin_factor = candidate_xmin / 90
-            effective_4gw = proj_4gw_weighted * xmin_factor
+        # Teams still at the 3-player limit once the outgoing player leaves
+        full_teams = {team for team, count in squad_team_counts.items()
+                      if count - (team == weak['team_id']) >= 3}
+        
+        shortlist = [
+            c for c in eligible_by_pos[pos]
+            if c[2] <= budget and c[0]['team'] not in full_teams
+        ]
+
+        # Histories are network-bound: fetch the whole shortlist concurrently
+        prefetch_player_histories((p['id'] for p, *_ in shortlist), current_gw)
 
-            # Skip low quality players (v4.0) - use effective pts
-            # v4.4: Lower threshold to 0.80 to catch good players with moderate xMin (e.g., Bruno at 12.6)
-            if effective_4gw < MIN_BUY_PROJECTION * 0.80:  # 15 * 0.80 = 12.0 pts minimum
+        candidates = []
+        for p, proj, cost, form_trend, avg_diff in shortlist:
+            if p['id'] not in candidate_stats:
+                candidate_stats[p['id']] = _candidate_stats(p, proj)
+            stats = candidate_stats[p['id']]
+            if stats is None:
                 continue
+            candidate_xmin, proj_4gw_weighted, effective_4gw = stats
+
+            proj_4gw_raw = proj.get('next_4gw_pts', 0)
 
             # v4.4: Use effective points for BOTH sides (fair apples-to-apples comparison)
             # This fixes bug where high-raw-projection but low-xMin players weren't being replaced
@@ -1044,25 +1359,22 @@ def get_transfer_recommendations(my_squad, all_players, projections, bank,
                 buy_score -= OWNERSHIP_WEIGHT * player_ownership
                 buy_reasons.append('template_risk')
 
-            if proj.get('form_trend') == 'hot':
+            if form_trend == 'hot':
                 buy_score += 1.5
                 buy_reasons.append('hot_form')
 
-            p_team_id = p['team']
-            upcoming_dgws = fixture_data['team_dgws'].get(p_team_id, [])
-            dgw_in_range = [gw for gw in upcoming_dgws if gw <= current_gw + 6]
-            if dgw_in_range:
+            dgw_gw = team_next_dgw.get(p['team'])
+            if dgw_gw is not None:
                 buy_score += 2
-                buy_reasons.append(f'dgw{dgw_in_range[0]}')
+                buy_reasons.append(f'dgw{dgw_gw}')
 
-            avg_diff = proj.get('avg_difficulty_4gw', 1.0)
             if avg_diff < 0.9:
                 buy_score += 1
                 buy_reasons.append('easy_fixtures')
 
             # Bonus for good near-term fixtures (GW1-2)
             fixtures = proj.get('fixtures', [])[:2]
-            near_term_easy = sum(1 for f in fixtures if f.get('difficulty', 1.0) < 0.95)
+            near_term_easy = sum(1 for f in fixtures if f.difficulty < 0.95)
             if near_term_easy >= 2:
                 buy_score += 1.5
                 buy_reasons.append('easy_next_2')
@@ -1081,8 +1393,9 @@ def get_transfer_recommendations(my_squad, all_players, projections, bank,
                 'buy_reasons': buy_reasons,
                 'cost': cost,
                 'value': round(value, 2),
-                'fixtures': proj.get('fixture_preview', [])[:4],
-                'form_trend': proj.get('form_trend', 'neutral'),
+                'fixtures': proj.get('fixture_preview', []),  # sliced on output
+                'form_trend': form_trend or 'neutral',
+                'proj': proj,
             })
 
         # Sort by buy_score
@@ -1152,7 +1465,7 @@ def get_transfer_recommendations(my_squad, all_players, projections, bank,
                 }
 
             p = best['player']
-            proj = projections.get(p['id'], {})
+            proj = best['proj']
 
             gain_4gw = best['gain_4gw']
             hit_value = gain_4gw - (4 * PLANNING_HORIZON / HIT_THRESHOLD_GWS)
@@ -1175,7 +1488,7 @@ def get_transfer_recommendations(my_squad, all_players, projections, bank,
                 'hit_value': round(hit_value, 1),
                 'value_score': best['value'],
                 'position': pos,
-                'fixtures': best['fixtures'],
+                'fixtures': best['fixtures'][:4],
                 'data_quality': proj.get('data_quality', 'unknown'),
                 'alternatives': alternatives,  # v4.1: Alternative suggestions
             })
@@ -1193,17 +1506,57 @@ def analyze_chip_strategy(my_squad, projections, fixture_data, team_strengths,
     Enhanced chip strategy that works even without confirmed DGW/BGW.
     Uses fixture difficulty and player projections to recommend optimal chip timing.
     """
+    if not chips_available:
+        return []
+
     recommendations = []
 
     dgw_gws = fixture_data['dgw_gws']
     bgw_gws = fixture_data['bgw_gws']
-    team_dgws = fixture_data['team_dgws']
+    team_dgws = {t: frozenset(gws) for t, gws in fixture_data['team_dgws'].items()}
     team_bgws = fixture_data['team_bgws']
     team_fixtures = fixture_data['team_fixtures']
 
+    # Set views for per-GW membership checks; the lists keep GW order
+    dgw_gws_set = frozenset(dgw_gws)
+    bgw_gws_set = frozenset(bgw_gws)
+
+    # team_strengths is fixed for the call, so each team's GW difficulties are
+    # too. TC and FH both sum them, and squad-mates share a team: compute once.
+    @lru_cache(maxsize=None)
+    def team_gw_difficulties(team_id, gw):
+        return tuple(
+            get_fixture_difficulty(team_strengths, fix['opponent_id'], fix['is_home'])
+            for fix in team_fixtures.get(team_id, _EMPTY_DICT).get(gw, ())
+        )
+
     # Analyze all upcoming GWs for fixture-based triggers
     gw_range = range(current_gw, current_gw + 6)
 
+    # Per-pick lookups shared by every chip branch, resolved once:
+    # (pick, projection, team's fixtures by GW, team's DGW set)
+    squad_ctx = []
+    for pick in my_squad:
+        team_id = pick.get('team_id', 0)
+        squad_ctx.append((
+            pick,
+            projections.get(pick['element'], _EMPTY_DICT),
+            team_fixtures.get(team_id, _EMPTY_DICT),
+            team_dgws.get(team_id, _EMPTY_SET),
+        ))
+
+    # Projection fixture entries by GW per player, indexed on first use.
+    # Returns None if the player has no projection for the GW.
+    proj_fixture_index = {}
+
+    def gw_projection(player_id, proj, gw):
+        index = proj_fixture_index.get(player_id)
+        if index is None:
+            index = proj_fixture_index[player_id] = {
+                f.gw: f for f in proj.get('fixtures', [])
+            }
+        return index.get(gw)
+
     # ==========================================================================
     # BENCH BOOST - Works without DGW by analyzing bench quality + fixtures
     # ==========================================================================
@@ -1212,39 +1565,39 @@ def analyze_chip_strategy(my_squad, projections, fixture_data, team_strengths,
         best_bb_score = 0
         bb_analysis = []
 
+        # DGW counts cover the whole squad; points/ease/xMin only the bench.
+        # Split once so the GW loop skips starters' per-GW lookups.
+        squad_dgws = [pick_dgws for _, _, _, pick_dgws in squad_ctx]
+        bench_ctx = [
+            # Estimate xMin from player data
+            (pick['element'], proj, pick_fixtures, proj.get('xmin', 60) if proj else 60)
+            for pick, proj, pick_fixtures, _ in squad_ctx
+            if pick.get('multiplier', 0) == 0
+        ]
+
         # Analyze ALL gameweeks, not just DGWs
         for gw in gw_range:
-            dgw_players = 0
+            dgw_players = sum(gw in pick_dgws for pick_dgws in squad_dgws)
             total_bench_proj = 0
             total_bench_xmin = 0
             fixture_ease_score = 0
 
-            for pick in my_squad:
-                team_id = pick.get('team_id', 0)
-                is_bench = pick.get('multiplier', 0) == 0
-                player_proj = projections.get(pick['element'], {})
-
-                has_dgw = gw in team_dgws.get(team_id, [])
-                gw_fixtures = team_fixtures.get(team_id, {}).get(gw, [])
-
-                if has_dgw:
-                    dgw_players += 1
-
-                if is_bench and gw_fixtures:
-                    # Get projected points for this specific GW
-                    gw_proj = next((f for f in player_proj.get('fixtures', [])
-                                   if f.get('gw') == gw), {})
-                    pts = gw_proj.get('projected_pts', 2)
-                    difficulty = gw_proj.get('difficulty', 1.0)
+            for player_id, player_proj, pick_fixtures, xmin in bench_ctx:
+                if not pick_fixtures.get(gw):
+                    continue
 
-                    # Calculate fixture ease (lower difficulty = easier)
-                    ease = max(0.5, 2.0 - difficulty)
-                    total_bench_proj += pts
-                    fixture_ease_score += ease
+                # Get projected points for this specific GW
+                gw_proj = gw_projection(player_id, player_proj, gw)
+                if gw_proj is not None:
+                    pts, difficulty = gw_proj.projected_pts, gw_proj.difficulty
+                else:
+                    pts, difficulty = 2, 1.0
 
-                    # Estimate xMin from player data
-                    xmin = player_proj.get('xmin', 60) if player_proj else 60
-                    total_bench_xmin += xmin
+                # Calculate fixture ease (lower difficulty = easier)
+                ease = max(0.5, 2.0 - difficulty)
+                total_bench_proj += pts
+                fixture_ease_score += ease
+                total_bench_xmin += xmin
 
             # Score: bench points * fixture ease * (xMin factor) * DGW bonus
             xmin_factor = min(1.2, total_bench_xmin / 240)  # 4 bench players * 60 avg mins
@@ -1258,7 +1611,7 @@ def analyze_chip_strategy(my_squad, projections, fixture_data, team_strengths,
                 'bench_xmin': round(total_bench_xmin, 0),
                 'fixture_ease': round(fixture_ease_score, 2),
                 'score': round(bb_score, 1),
-                'is_dgw': gw in dgw_gws,
+                'is_dgw': gw in dgw_gws_set,
             })
 
             if bb_score > best_bb_score:
@@ -1281,7 +1634,7 @@ def analyze_chip_strategy(my_squad, projections, fixture_data, team_strengths,
                 'confidence': 'HIGH' if (is_dgw and best['dgw_players'] >= 10) or best['score'] > 15 else 'MEDIUM',
                 'reasoning': reasoning,
                 'action_needed': f"Ensure bench has high xMin players with easy fixtures by GW{best_bb_gw}.",
-                'analysis': sorted(bb_analysis, key=lambda x: -x['score'])[:5],
+                'analysis': heapq.nlargest(5, bb_analysis, key=itemgetter('score')),
             })
 
     # ==========================================================================
@@ -1293,44 +1646,42 @@ def analyze_chip_strategy(my_squad, projections, fixture_data, team_strengths,
         best_tc_score = 0
         tc_analysis = []
 
-        premiums = [p for p in my_squad if p.get('selling_price', 0) / 10 >= 10]
+        # Per-premium values that don't change across GWs:
+        # (id, team, name, proj, fixtures by GW, fallback pts, xmin, xmin factor)
+        premiums = []
+        for pick, proj, pick_fixtures, _ in squad_ctx:
+            if pick.get('selling_price', 0) / 10 < 10:
+                continue
+            # xMin factor - higher xMin = more reliable captain
+            xmin = proj.get('xmin', 85) if proj else 85
+            premiums.append((
+                pick['element'], pick.get('team_id', 0), pick.get('web_name', 'Unknown'), proj, pick_fixtures,
+                proj.get('next_gw_pts', 4), xmin, min(1.1, xmin / 85),
+            ))
 
         # Analyze ALL gameweeks for premium players
         for gw in gw_range:
-            for pick in premiums:
-                team_id = pick.get('team_id', 0)
-                player_id = pick['element']
-                player_name = pick.get('web_name', 'Unknown')
-                proj = projections.get(player_id, {})
-
-                gw_fixtures = team_fixtures.get(team_id, {}).get(gw, [])
+            for player_id, team_id, player_name, proj, pick_fixtures, fallback_pts, xmin, xmin_factor in premiums:
+                gw_fixtures = pick_fixtures.get(gw, [])
                 if not gw_fixtures:
                     continue
 
                 # Calculate fixture quality
-                total_diff = 0
-                fixture_strs = []
+                total_diff = sum(team_gw_difficulties(team_id, gw))
                 home_bonus = 0
+                any_home = False
 
                 for fix in gw_fixtures:
-                    diff = get_fixture_difficulty(team_strengths, fix['opponent_id'], fix['is_home'])
-                    total_diff += diff
-                    h_a = '(H)' if fix['is_home'] else '(A)'
-                    fixture_strs.append(f"{fix['opponent']} {h_a}")
                     if fix['is_home']:
                         home_bonus += 0.1
+                        any_home = True
 
                 avg_diff = total_diff / len(gw_fixtures) if gw_fixtures else 1.0
                 is_dgw = len(gw_fixtures) >= 2
 
                 # Get projected points
-                gw_proj = next((f for f in proj.get('fixtures', [])
-                               if f.get('gw') == gw), {})
-                base_pts = gw_proj.get('projected_pts', proj.get('next_gw_pts', 4))
-
-                # xMin factor - higher xMin = more reliable captain
-                xmin = proj.get('xmin', 85) if proj else 85
-                xmin_factor = min(1.1, xmin / 85)
+                gw_proj = gw_projection(player_id, proj, gw)
+                base_pts = gw_proj.projected_pts if gw_proj is not None else fallback_pts
 
                 # TC score: projected * 3 * ease * home_bonus * xmin_factor * dgw_bonus
                 ease_mult = max(0.7, 2.0 - avg_diff)
@@ -1341,9 +1692,9 @@ def analyze_chip_strategy(my_squad, projections, fixture_data, team_strengths,
                     'gw': gw,
                     'player': player_name,
                     'player_id': player_id,
-                    'fixtures': fixture_strs,
+                    'fixtures': gw_fixtures,  # Labelled only for the entries we output
                     'avg_difficulty': round(avg_diff, 2),
-                    'is_home': any(f['is_home'] for f in gw_fixtures),
+                    'is_home': any_home,
                     'is_dgw': is_dgw,
                     'projected_tc_pts': round(tc_score, 1),
                     'xmin': xmin,
@@ -1356,7 +1707,7 @@ def analyze_chip_strategy(my_squad, projections, fixture_data, team_strengths,
 
         if best_tc_gw and best_tc_score > 15:  # Minimum threshold
             best = next(a for a in tc_analysis if a['gw'] == best_tc_gw and a['player'] == best_tc_player)
-            reasoning = f"TC {best_tc_player} in GW{best_tc_gw} ({', '.join(best['fixtures'])})"
+            reasoning = f"TC {best_tc_player} in GW{best_tc_gw} ({', '.join(format_fixture_labels(best['fixtures']))})"
             if best['is_dgw']:
                 reasoning += " - DOUBLE GAMEWEEK"
             elif best['is_home']:
@@ -1370,7 +1721,10 @@ def analyze_chip_strategy(my_squad, projections, fixture_data, team_strengths,
                 'confidence': 'HIGH' if best['is_dgw'] or (best['avg_difficulty'] < 0.85 and best['is_home']) else 'MEDIUM',
                 'reasoning': reasoning,
                 'action_needed': f"Ensure {best_tc_player} is in your squad for GW{best_tc_gw}.",
-                'analysis': sorted(tc_analysis, key=lambda x: -x['projected_tc_pts'])[:5],
+                'analysis': [
+                    {**a, 'fixtures': format_fixture_labels(a['fixtures'])}
+                    for a in heapq.nlargest(5, tc_analysis, key=itemgetter('projected_tc_pts'))
+                ],
             })
 
     # ==========================================================================
@@ -1387,15 +1741,13 @@ def analyze_chip_strategy(my_squad, projections, fixture_data, team_strengths,
             squad_difficulty = 0
             hard_fixture_count = 0
 
-            for pick in my_squad:
-                team_id = pick.get('team_id', 0)
-                gw_fixtures = team_fixtures.get(team_id, {}).get(gw, [])
+            for pick, _, pick_fixtures, _ in squad_ctx:
+                gw_fixtures = pick_fixtures.get(gw, [])
 
                 if gw_fixtures:
                     players_with_fixtures += 1
                     # Sum up fixture difficulties
-                    for fix in gw_fixtures:
-                        diff = get_fixture_difficulty(team_strengths, fix['opponent_id'], fix['is_home'])
+                    for diff in team_gw_difficulties(pick.get('team_id', 0), gw):
                         squad_difficulty += diff
                         if diff > 1.1:  # Hard fixture
                             hard_fixture_count += 1
@@ -1415,7 +1767,7 @@ def analyze_chip_strategy(my_squad, projections, fixture_data, team_strengths,
                 'avg_difficulty': round(squad_difficulty / max(1, players_with_fixtures), 2),
                 'hard_fixtures': hard_fixture_count,
                 'score': round(fh_score, 1),
-                'is_bgw': gw in bgw_gws,
+                'is_bgw': gw in bgw_gws_set,
             })
 
             if fh_score > best_fh_score:
@@ -1438,7 +1790,7 @@ def analyze_chip_strategy(my_squad, projections, fixture_data, team_strengths,
                 'reasoning': reasoning,
                 'action_needed': f"Save Free Hit for GW{best_fh_gw}. Don't waste transfers preparing.",
                 'players_blanking': best['blanking_names'] if best['blanking_names'] else None,
-                'analysis': sorted(fh_analysis, key=lambda x: -x['score'])[:5],
+                'analysis': heapq.nlargest(5, fh_analysis, key=itemgetter('score')),
             })
 
     # ==========================================================================
@@ -1448,55 +1800,48 @@ def analyze_chip_strategy(my_squad, projections, fixture_data, team_strengths,
         wc_triggers = []
         wc_score = 0
 
-        # Count cold/out-of-form players
+        # One pass over the squad: cold players, DGW coverage, injuries/doubts,
+        # falling prices and the squad's 4GW fixture difficulty
         cold_players = []
-        for pick in my_squad:
-            proj = projections.get(pick['element'], {})
+        dgw_coverage = 0
+        injured = 0
+        value_loss = 0
+        total_4gw_difficulty = 0
+        future_dgws = {gw for gw in dgw_gws if gw > current_gw}
+        for pick, proj, _, pick_dgws in squad_ctx:
             if proj.get('form_trend') == 'cold':
-                wc_score += 1
                 cold_players.append(pick.get('web_name', 'Unknown'))
+            if not future_dgws.isdisjoint(pick_dgws):
+                dgw_coverage += 1
+            chance = proj.get('chance_of_playing')
+            if chance is not None and chance < 75:
+                injured += 1
+            price_trend = proj.get('price_trend', {})
+            if isinstance(price_trend, dict) and price_trend.get('trend') in ['falling', 'falling_fast']:
+                value_loss += 1
+            total_4gw_difficulty += proj.get('avg_difficulty_4gw', 1.0)
 
+        # Count cold/out-of-form players
+        wc_score += len(cold_players)
         if len(cold_players) >= 3:
             wc_triggers.append(f'{len(cold_players)}_cold_players')
 
         # Check DGW coverage (if DGWs exist)
-        dgw_coverage = 0
-        if dgw_gws:
-            for pick in my_squad:
-                team_id = pick.get('team_id', 0)
-                if any(gw in team_dgws.get(team_id, []) for gw in dgw_gws if gw > current_gw):
-                    dgw_coverage += 1
-
-            if dgw_coverage < 8:
-                wc_score += 3
-                wc_triggers.append('poor_dgw_coverage')
+        if dgw_gws and dgw_coverage < 8:
+            wc_score += 3
+            wc_triggers.append('poor_dgw_coverage')
 
         # Count injuries/doubts
-        injured = sum(1 for p in my_squad
-                     if projections.get(p['element'], {}).get('chance_of_playing') is not None
-                     and projections.get(p['element'], {}).get('chance_of_playing') < 75)
         if injured >= 3:
             wc_score += 2
             wc_triggers.append(f'{injured}_injuries')
 
         # Check for value bleeding (players losing value)
-        value_loss = 0
-        for pick in my_squad:
-            proj = projections.get(pick['element'], {})
-            price_trend = proj.get('price_trend', {})
-            if isinstance(price_trend, dict) and price_trend.get('trend') in ['falling', 'falling_fast']:
-                value_loss += 1
-
         if value_loss >= 4:
             wc_score += 2
             wc_triggers.append(f'{value_loss}_falling_prices')
 
         # Check for overall squad fixture difficulty in next 4 GWs
-        total_4gw_difficulty = 0
-        for pick in my_squad:
-            proj = projections.get(pick['element'], {})
-            total_4gw_difficulty += proj.get('avg_difficulty_4gw', 1.0)
-
         avg_squad_difficulty = total_4gw_difficulty / len(my_squad) if my_squad else 1.0
         if avg_squad_difficulty > 1.15:  # Hard upcoming fixtures
             wc_score += 2
@@ -1527,57 +1872,60 @@ def analyze_chip_strategy(my_squad, projections, fixture_data, team_strengths,
 # CAPTAIN SELECTION + DIFFERENTIAL ANALYSIS (v4.0)
 # =============================================================================
 
-def get_captain_picks(my_squad, projections, all_players, fixture_data, current_gw):
+def get_captain_picks(my_squad, projections, all_players, fixture_data, current_gw, players_by_id=None):
     """
     Enhanced captain selection with differential analysis.
     Calculates EO impact and risk/reward for each captain choice.
+    Pass players_by_id if the caller already has all_players indexed by id.
     """
     captain_options = []
-    player_lookup = {p['id']: p for p in all_players}
-
-    # Find template captains (highest owned premiums in the game)
-    all_sorted_by_ownership = sorted(
-        [(p['id'], float(p.get('selected_by_percent', 0)), p.get('web_name', ''))
-         for p in all_players if p['now_cost'] >= 100],  # 10.0m+
-        key=lambda x: -x[1]
+    player_lookup = players_by_id if players_by_id is not None else {p['id']: p for p in all_players}
+
+    # Find template captains (highest owned premiums in the game) - only the
+    # top 3 are used, so take them without sorting every premium
+    top_owned_premiums = heapq.nlargest(
+        3,
+        ((p['id'], float(p.get('selected_by_percent', 0)), p.get('web_name', ''))
+         for p in all_players if p['now_cost'] >= 100),  # 10.0m+
+        key=itemgetter(1)
     )
-    template_captain_ids = [p[0] for p in all_sorted_by_ownership[:3]]
-    template_captains = {p[0]: {'ownership': p[1], 'name': p[2]} for p in all_sorted_by_ownership[:3]}
+    template_captains = {pid: {'ownership': own, 'name': name} for pid, own, name in top_owned_premiums}
 
     # Get template captain's projected points (for differential calc)
     template_proj_pts = max(
-        projections.get(pid, {}).get('next_gw_pts', 0)
-        for pid in template_captain_ids
-    ) if template_captain_ids else 6.0
+        (projections.get(pid, _EMPTY_DICT).get('next_gw_pts', 0) for pid in template_captains),
+        default=6.0,
+    )
+
+    # Template EO for the downside calc: ~half of the top template's owners
+    # captain. nlargest returns highest ownership first.
+    template_eo = top_owned_premiums[0][1] * 0.5 if top_owned_premiums else 0
+
+    team_dgws = fixture_data['team_dgws']
+    next_gw = current_gw + 1
 
     for pick in my_squad:
         if pick.get('multiplier', 0) == 0:
             continue
 
         player_id = pick['element']
-        proj = projections.get(player_id, {})
-        player = player_lookup.get(player_id, {})
+        proj = projections.get(player_id, _EMPTY_DICT)
+        player = player_lookup.get(player_id, _EMPTY_DICT)
 
         proj_pts = proj.get('next_gw_pts', 0)
         if proj_pts > 2:
             ownership = float(player.get('selected_by_percent', 0))
 
             team_id = pick.get('team_id', player.get('team', 0))
-            has_dgw = (current_gw + 1) in fixture_data['team_dgws'].get(team_id, [])
+            has_dgw = next_gw in team_dgws.get(team_id, [])
 
             # Calculate Effective Ownership (EO) - estimate of captain ownership
             # Higher owned players are more likely to be captained
-            if ownership > 50:
-                estimated_captain_pct = ownership * 0.6  # ~60% of owners captain
-            elif ownership > 30:
-                estimated_captain_pct = ownership * 0.4
-            elif ownership > 15:
-                estimated_captain_pct = ownership * 0.25
-            else:
-                estimated_captain_pct = ownership * 0.1
+            captain_share = CAPTAIN_SHARE_BY_BAND[bisect_left(CAPTAIN_SHARE_BANDS, ownership)]
+            estimated_captain_pct = ownership * captain_share
 
             # Differential value: points gained/lost vs template
-            is_template = player_id in template_captain_ids
+            is_template = player_id in template_captains
             diff_vs_template = proj_pts - template_proj_pts
 
             # Risk/reward calculation
@@ -1591,7 +1939,6 @@ def get_captain_picks(my_squad, projections, all_players, fixture_data, current_
                 # Upside = extra points * (100 - your EO)% of managers don't have this captain
                 upside = max(0, diff_vs_template * 2) * (100 - estimated_captain_pct) / 100
                 # Downside = lost points * template EO%
-                template_eo = max(tc['ownership'] for tc in template_captains.values()) * 0.5
                 downside = max(0, -diff_vs_template * 2) * template_eo / 100
 
                 if upside > downside * 1.5:
@@ -1643,8 +1990,6 @@ def get_captain_picks(my_squad, projections, all_players, fixture_data, current_
                 # Calculate risk/reward
                 # If diff hauls (2x expected): you gain eo_advantage % on field
                 # If safe hauls (2x expected): you lose eo_advantage % on field
-                haul_scenario = c['projected_pts'] * 2  # If they score double projected
-                safe_haul = safe_pts * 2
 
                 # Risk assessment
                 if pts_diff >= 0:
@@ -1674,7 +2019,7 @@ def get_captain_picks(my_squad, projections, all_players, fixture_data, current_
         'differential_pick': best_differential,
         'all_differentials': differential_picks[:3],  # Top 3 differential options
         'template_captains': [
-            {'name': tc['name'], 'ownership': tc['ownership'], 'projected': projections.get(pid, {}).get('next_gw_pts', 0)}
+            {'name': tc['name'], 'ownership': tc['ownership'], 'projected': projections.get(pid, _EMPTY_DICT).get('next_gw_pts', 0)}
             for pid, tc in template_captains.items()
         ],
     }
@@ -1684,26 +2029,44 @@ def get_captain_picks(my_squad, projections, all_players, fixture_data, current_
 # MAIN EXECUTION
 # =============================================================================
 
+def write_json(path, data):
+    """Write data as 2-space indented JSON (orjson also serializes datetimes)."""
+    path.write_bytes(orjson.dumps(data, option=orjson.OPT_INDENT_2))
+
+
 def run_projections():
     print("=" * 60)
     print("FPL BRAIN v4.0 - Projection Engine")
     print("=" * 60)
     
     print("\nFetching FPL data...")
-    bootstrap = fetch_json(BOOTSTRAP_URL)
-    fixtures = fetch_json(FIXTURES_URL)
+    # The startup fetches are independent, so issue them together and block on
+    # each only where it is first needed. Picks wait on current_gw.
+    pool = ThreadPoolExecutor(max_workers=6)
+    bootstrap_future = pool.submit(fetch_json, BOOTSTRAP_URL)
+    fixtures_future = pool.submit(fetch_json, FIXTURES_URL)
+    understat_future = pool.submit(get_understat_data)
+    entry_future = pool.submit(fetch_json, TEAM_URL)
+    history_future = pool.submit(fetch_json, HISTORY_URL)
+    bootstrap = bootstrap_future.result()
+    fixtures = fixtures_future.result()
     
     if not bootstrap or not fixtures:
+        pool.shutdown(wait=False, cancel_futures=True)
         print("Failed to fetch FPL data!")
         return
     
     players = bootstrap['elements']
+    players_by_id = {p['id']: p for p in players}
     teams = bootstrap['teams']
     events = bootstrap['events']
     
-    understat_players, understat_teams = get_understat_data()
-    
     current_gw = next((e['id'] for e in events if e['is_current']), 1)
+    picks_future = pool.submit(fetch_json, PICKS_URL.format(gw=current_gw))
+    pool.shutdown(wait=False)
+    
+    understat_players, understat_teams = understat_future.result()
+    
     next_gw = next((e['id'] for e in events if e['is_next']), current_gw + 1)
     print(f"Current GW: {current_gw}, Next GW: {next_gw}")
     
@@ -1715,10 +2078,33 @@ def run_projections():
     team_strengths = calculate_team_strengths(understat_teams, teams)
     team_lookup = {t['id']: t for t in teams}
     team_name_map = {t['id']: t['name'] for t in teams}
+    understat_by_team = (build_understat_team_index(understat_players, team_name_map)
+                         if understat_players else {})
     
     print("Calculating projections...")
     projections = {}
     matched_count = 0
+    team_gw_fixtures = precompute_team_gw_fixtures(fixture_data, team_strengths, next_gw)
+    no_fixtures = [{'gw': gw, 'is_bgw': True} for gw in range(next_gw, next_gw + 6)]
+    # The 4GW average difficulty depends only on the team: total over the
+    # window's non-blank GWs, divided by the non-blank count in the first 4
+    team_avg_difficulty_4gw = {}
+    for team_id, team_gws in team_gw_fixtures.items():
+        total_difficulty = 0
+        for team_gw in team_gws:
+            if not team_gw['is_bgw']:
+                total_difficulty += team_gw['avg_difficulty']
+        non_blank_gws = sum(not team_gw['is_bgw'] for team_gw in team_gws[:4])
+        avg_difficulty_4gw = (total_difficulty / non_blank_gws) if non_blank_gws else 1.0
+        team_avg_difficulty_4gw[team_id] = round(avg_difficulty_4gw, 2)
+    # A blank GW's projection and preview entries are the same for every player
+    # without a fixture, so build them once and share them (read-only)
+    blank_entries = {
+        gw: (GwProjection(gw=gw, projected_pts=0, opponent='BLANK',
+                          is_home=False, difficulty=0, is_dgw=False, is_bgw=True),
+             {'gw': gw, 'fixture': 'BLANK', 'difficulty': 0})
+        for gw in range(next_gw, next_gw + 6)
+    }
     
     for player in players:
         player_id = player['id']
@@ -1728,7 +2114,7 @@ def run_projections():
         us_match = None
         if understat_players:
             us_match = match_player_names(
-                player, understat_players, team_name_map
+                player, understat_by_team.get(team_id, ((), _EMPTY_DICT))
             )
             if us_match:
                 matched_count += 1
@@ -1738,69 +2124,56 @@ def run_projections():
             continue
         
         form_data = calculate_form_score(player)
-        team_fixtures = fixture_data['team_fixtures'].get(team_id, {})
         team_cs_prob = team_strengths.get(team_id, {}).get('cs_prob', 0.2)
         team_dgws = fixture_data['team_dgws'].get(team_id, [])
+        point_factors = gameweek_point_factors(player, xgi_stats, element_type, team_cs_prob)
         
         gw_projections = []
-        total_difficulty = 0
+        gw_pts_list = []  # per-GW projected_pts, kept flat for the horizon sums
         fixture_preview = []
         
-        for gw in range(next_gw, next_gw + 6):
-            gw_fixtures = team_fixtures.get(gw, [])
-            is_dgw = len(gw_fixtures) >= 2
-            is_bgw = len(gw_fixtures) == 0
+        for team_gw in team_gw_fixtures.get(team_id, no_fixtures):
+            gw = team_gw['gw']
             
-            if is_bgw:
-                gw_projections.append({
-                    'gw': gw, 'projected_pts': 0, 'opponent': 'BLANK',
-                    'is_home': False, 'difficulty': 0, 'is_dgw': False, 'is_bgw': True
-                })
-                fixture_preview.append({'gw': gw, 'fixture': 'BLANK', 'difficulty': 0})
+            if team_gw['is_bgw']:
+                blank_projection, blank_preview = blank_entries[gw]
+                gw_projections.append(blank_projection)
+                gw_pts_list.append(0)
+                fixture_preview.append(blank_preview)
                 continue
             
+            # Only the points projection is player-specific; unavailable
+            # players (no point_factors) project 0 without the per-fixture math
             gw_pts = 0
-            gw_opponents = []
-            gw_difficulty = 0
-            
-            for fix in gw_fixtures:
-                opp_id = fix['opponent_id']
-                diff = get_fixture_difficulty(team_strengths, opp_id, fix['is_home'])
-                opp_cs = team_strengths.get(opp_id, {}).get('cs_prob', 0.2)
-                
-                pts = project_gameweek_points(
-                    player, xgi_stats, diff, opp_cs, element_type, team_cs_prob,
-                    is_dgw=False
-                )
-                gw_pts += pts
-                gw_difficulty += diff
-                
-                h_a = '(H)' if fix['is_home'] else '(A)'
-                gw_opponents.append(f"{fix['opponent']} {h_a}")
+            if point_factors is not None:
+                for diff in team_gw['difficulties']:
+                    gw_pts += project_fixture_points(point_factors, diff)
+            gw_pts = round(gw_pts, 2)
+            gw_pts_list.append(gw_pts)
             
-            avg_diff = gw_difficulty / len(gw_fixtures)
-            total_difficulty += avg_diff
+            difficulty = team_gw['difficulty']
             
-            gw_projections.append({
-                'gw': gw,
-                'projected_pts': round(gw_pts, 2),
-                'opponent': ', '.join(gw_opponents),
-                'is_home': gw_fixtures[0]['is_home'] if gw_fixtures else False,
-                'difficulty': round(avg_diff, 2),
-                'is_dgw': is_dgw,
-                'is_bgw': False,
-            })
+            gw_projections.append(GwProjection(
+                gw=gw,
+                projected_pts=gw_pts,
+                opponent=team_gw['opponent'],
+                is_home=team_gw['is_home'],
+                difficulty=difficulty,
+                is_dgw=team_gw['is_dgw'],
+                is_bgw=False,
+            ))
             
             fixture_preview.append({
                 'gw': gw,
-                'fixture': ', '.join(gw_opponents),
-                'difficulty': round(avg_diff, 2),
-                'is_dgw': is_dgw,
+                'fixture': team_gw['opponent'],
+                'difficulty': difficulty,
+                'is_dgw': team_gw['is_dgw'],
             })
         
-        next_fix = gw_projections[0] if gw_projections else {}
-        non_blank_gws = [g for g in gw_projections[:4] if not g.get('is_bgw')]
-        avg_difficulty_4gw = (total_difficulty / len(non_blank_gws)) if non_blank_gws else 1.0
+        next_fix = gw_projections[0]  # the window always has 6 entries, blanks included
+        # 6GW total continues from the 4GW one (same left-to-right summation)
+        next_4gw_pts = sum(gw_pts_list[:4])
+        next_6gw_pts = sum(gw_pts_list[4:6], next_4gw_pts)
         
         # Parse injury news for severity (v4.0 quick win)
         injury_info = parse_injury_news(player.get('news', ''))
@@ -1821,14 +2194,14 @@ def run_projections():
             'chance_of_playing': player.get('chance_of_playing_next_round'),
             'xg_p90': round(xgi_stats.get('xg_p90', 0), 3),
             'xa_p90': round(xgi_stats.get('xa_p90', 0), 3),
-            'next_gw_pts': next_fix.get('projected_pts', 0),
-            'next_fixture': next_fix.get('opponent', '?'),
-            'next_fixture_diff': next_fix.get('difficulty', 1.0),
+            'next_gw_pts': next_fix.projected_pts,
+            'next_fixture': next_fix.opponent,
+            'next_fixture_diff': next_fix.difficulty,
             'has_dgw_soon': bool(team_dgws),
             'dgw_gws': team_dgws,
-            'next_4gw_pts': round(sum(g['projected_pts'] for g in gw_projections[:4]), 1),
-            'next_6gw_pts': round(sum(g['projected_pts'] for g in gw_projections[:6]), 1),
-            'avg_difficulty_4gw': round(avg_difficulty_4gw, 2),
+            'next_4gw_pts': round(next_4gw_pts, 1),
+            'next_6gw_pts': round(next_6gw_pts, 1),
+            'avg_difficulty_4gw': team_avg_difficulty_4gw.get(team_id, 1.0),
             'fixtures': gw_projections,
             'fixture_preview': fixture_preview,
             'data_quality': xgi_stats.get('data_quality', 'unknown'),
@@ -1838,9 +2211,9 @@ def run_projections():
     
     # Get user's team
     print("Fetching your team...")
-    my_team_data = fetch_json(PICKS_URL.format(gw=current_gw))
-    my_entry = fetch_json(TEAM_URL)
-    my_history = fetch_json(HISTORY_URL)
+    my_team_data = picks_future.result()
+    my_entry = entry_future.result()
+    my_history = history_future.result()
     
     transfers = []
     captains = []
@@ -1856,14 +2229,19 @@ def run_projections():
         print("Fetching rolling form for your squad...")
         for pick in my_picks:
             player_id = pick['element']
-            p = next((pl for pl in players if pl['id'] == player_id), {})
+            p = players_by_id.get(player_id, {})
             pick['element_type'] = p.get('element_type', 0)
             pick['web_name'] = p.get('web_name', 'Unknown')
             pick['selling_price'] = pick.get('selling_price', p.get('now_cost', 0))
             pick['team_id'] = p.get('team', 0)
 
+        # Fetch the squad's histories concurrently, then apply them in pick order
+        prefetch_player_histories((pick['element'] for pick in my_picks), next_gw)
+        for pick in my_picks:
+            player_id = pick['element']
+
             # Get detailed history and calculate rolling form
-            history_data = get_player_history(player_id)
+            history_data = get_player_history(player_id, next_gw)
             if history_data and 'history' in history_data:
                 rolling = calculate_rolling_form(history_data['history'], matches=5)
                 # Update projection with rolling form data
@@ -1874,12 +2252,11 @@ def run_projections():
         
         bank = my_entry.get('last_deadline_bank', 0) / 10
         
-        chips_available = {'bench_boost', 'triple_captain', 'free_hit', 'wildcard'}
-        if my_history and 'chips' in my_history:
-            for chip in my_history['chips']:
-                chip_name = chip.get('name', '').lower().replace(' ', '_')
-                if chip_name in chips_available:
-                    chips_available.discard(chip_name)
+        used_chips = {
+            chip.get('name', '').lower().replace(' ', '_')
+            for chip in (my_history or {}).get('chips', [])
+        }
+        chips_available = {'bench_boost', 'triple_captain', 'free_hit', 'wildcard'} - used_chips
         
         print(f"Chips available: {chips_available}")
         
@@ -1888,7 +2265,7 @@ def run_projections():
             fixture_data, team_strengths, next_gw
         )
         
-        captains = get_captain_picks(my_picks, projections, players, fixture_data, current_gw)
+        captains = get_captain_picks(my_picks, projections, players, fixture_data, current_gw, players_by_id)
         
         chip_strategy = analyze_chip_strategy(
             my_picks, projections, fixture_data, team_strengths,
@@ -1902,13 +2279,14 @@ def run_projections():
             fixture_data, team_strengths, next_gw
         )
         
-        my_team_output = {
-            'team_id': TEAM_ID,
-            'current_gw': current_gw,
-            'next_gw': next_gw,
-            'bank': round(bank, 1),
-            'chips_available': list(chips_available),
-            'squad': [{
+        squad_output = []
+        total_projected_pts = 0  # playing XI, captain multiplier applied
+        for p in my_picks:
+            proj = projections.get(p['element'], {})
+            projected_pts = proj.get('next_gw_pts', 0)
+            if p['multiplier'] > 0:
+                total_projected_pts += projected_pts * p['multiplier']
+            squad_output.append({
                 'player_id': p['element'],
                 'name': p['web_name'],
                 'position': p['element_type'],
@@ -1917,25 +2295,30 @@ def run_projections():
                 'is_vice': p['is_vice_captain'],
                 'multiplier': p['multiplier'],
                 'selling_price': p['selling_price'] / 10,
-                'projected_pts': projections.get(p['element'], {}).get('next_gw_pts', 0),
-                'projected_4gw': projections.get(p['element'], {}).get('next_4gw_pts', 0),
-                'form_trend': projections.get(p['element'], {}).get('form_trend', 'neutral'),
-                'rolling_form': projections.get(p['element'], {}).get('rolling_form'),
-                'form_direction': projections.get(p['element'], {}).get('form_direction'),
-                'news': projections.get(p['element'], {}).get('news', ''),
-                'news_severity': projections.get(p['element'], {}).get('news_severity', 0),
-                'news_category': projections.get(p['element'], {}).get('news_category', 'healthy'),
-                'fixture_preview': projections.get(p['element'], {}).get('fixture_preview', [])[:4],
-            } for p in my_picks],
-            'total_projected_pts': round(sum(
-                projections.get(p['element'], {}).get('next_gw_pts', 0) * p['multiplier']
-                for p in my_picks if p['multiplier'] > 0
-            ), 1),
+                'projected_pts': projected_pts,
+                'projected_4gw': proj.get('next_4gw_pts', 0),
+                'form_trend': proj.get('form_trend', 'neutral'),
+                'rolling_form': proj.get('rolling_form'),
+                'form_direction': proj.get('form_direction'),
+                'news': proj.get('news', ''),
+                'news_severity': proj.get('news_severity', 0),
+                'news_category': proj.get('news_category', 'healthy'),
+                'fixture_preview': proj.get('fixture_preview', [])[:4],
+            })
+        
+        my_team_output = {
+            'team_id': TEAM_ID,
+            'current_gw': current_gw,
+            'next_gw': next_gw,
+            'bank': round(bank, 1),
+            'chips_available': list(chips_available),
+            'squad': squad_output,
+            'total_projected_pts': round(total_projected_pts, 1),
         }
     
     # Build outputs
     recommendations = {
-        'generated_at': datetime.utcnow().isoformat(),
+        'generated_at': datetime.utcnow(),
         'next_gameweek': next_gw,
         'data_source': f"Understat ({matched_count} players matched)",
         'captain_picks': captains,
@@ -1947,39 +2330,36 @@ def run_projections():
         },
     }
     
+    pos_buckets = defaultdict(list)
+    for p in projections.values():
+        pos_buckets[p['position']].append(p)
     top_by_position = {}
     for pos, name in [(1, 'GK'), (2, 'DEF'), (3, 'MID'), (4, 'FWD')]:
-        pos_players = [p for p in projections.values() if p['position'] == pos]
-        pos_players.sort(key=lambda x: x['next_4gw_pts'], reverse=True)
-        top_by_position[name] = pos_players[:15]
+        top_by_position[name] = heapq.nlargest(15, pos_buckets[pos], key=itemgetter('next_4gw_pts'))
     
     # Save outputs
     output_dir = Path('public/data')
     output_dir.mkdir(parents=True, exist_ok=True)
     
-    with open(output_dir / 'projections.json', 'w') as f:
-        json.dump({
-            'generated_at': datetime.utcnow().isoformat(),
-            'next_gameweek': next_gw,
-            'top_by_position': top_by_position,
-        }, f, indent=2)
+    write_json(output_dir / 'projections.json', {
+        'generated_at': datetime.utcnow(),
+        'next_gameweek': next_gw,
+        'top_by_position': top_by_position,
+    })
     
-    with open(output_dir / 'recommendations.json', 'w') as f:
-        json.dump(recommendations, f, indent=2)
+    write_json(output_dir / 'recommendations.json', recommendations)
     
     if my_team_output:
-        with open(output_dir / 'my_team.json', 'w') as f:
-            json.dump(my_team_output, f, indent=2)
+        write_json(output_dir / 'my_team.json', my_team_output)
     
     # Save Starting XI recommendations (NEW)
     if starting_xi_recs:
-        with open(output_dir / 'starting_xi.json', 'w') as f:
-            json.dump({
-                'generated_at': datetime.utcnow().isoformat(),
-                'team_id': TEAM_ID,
-                'next_gameweek': next_gw,
-                'recommendations': starting_xi_recs,
-            }, f, indent=2)
+        write_json(output_dir / 'starting_xi.json', {
+            'generated_at': datetime.utcnow(),
+            'team_id': TEAM_ID,
+            'next_gameweek': next_gw,
+            'recommendations': starting_xi_recs,
+        })
     
     print(f"\n{'=' * 60}")
     print("RESULTS")